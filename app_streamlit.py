@@ -1,74 +1,23 @@
 from __future__ import annotations
 
-import os
 import time
+import pandas as pd
 import streamlit as st
 
-from finnhub import FinnhubClient
-from financials_as_reported import parse_periods, build_fundamentals_from_reported
 from buffett import buffett_screen
 from graham import graham_screen
-from sp500 import get_sp500_tickers
-from stoxx import get_stoxx_europe_600
-from cdax import get_de_exchange_equities
-from world import get_msci_world_universe_via_etf
+from cached import (
+    QUOTE_TTL, REPORTED_TTL, UNIVERSE_TTL,
+    api_key, get_quote, get_profile, get_reported, load_universe,
+)
+from screens import explain_screen, relative_spec
+from screening import screen_with_budget, score_rows, universe_frame, UNFINISHED
+from export import to_csv_bytes, to_parquet_bytes
+from ranking import ranking_table, sort_rows, status_label, verdict
 
 st.set_page_config(page_title="Value Screener", layout="wide")
 
-QUOTE_TTL = 20
-PROFILE_TTL = 24 * 60 * 60
-REPORTED_TTL = 6 * 60 * 60
-UNIVERSE_TTL = 24 * 60 * 60
-
-def api_key() -> str:
-    return (st.secrets.get("FINNHUB_API_KEY", None) or os.getenv("FINNHUB_API_KEY") or "").strip()
-
-def score_combo(buffett_score: int, graham_score: int) -> int:
-    # GANÉ-ish: quality > cheap (adjust later if desired)
-    return int(round(0.65 * buffett_score + 0.35 * graham_score))
-
-def verdict(score: int) -> str:
-    if score >= 80: return "✅ Stark"
-    if score >= 60: return "⚠️ Okay"
-    return "❌ Schwach"
-
-def normalize_shares(shares_raw: float | None) -> float | None:
-    if shares_raw is None:
-        return None
-    s = float(shares_raw)
-    # Heuristic: if very small, treat as "millions"
-    if s < 100_000:
-        return s * 1_000_000.0
-    return s
-
-@st.cache_data(ttl=QUOTE_TTL)
-def get_quote(symbol: str) -> dict:
-    return FinnhubClient(api_key=api_key()).quote(symbol)
-
-@st.cache_data(ttl=PROFILE_TTL)
-def get_profile(symbol: str) -> dict:
-    return FinnhubClient(api_key=api_key()).profile2(symbol)
-
-@st.cache_data(ttl=REPORTED_TTL)
-def get_reported(symbol: str) -> dict:
-    return FinnhubClient(api_key=api_key()).financials_reported(symbol)
-
-@st.cache_data(ttl=UNIVERSE_TTL)
-def load_universe(choice: str, world_etf: str = "URTH") -> list[str]:
-    k = api_key()
-    if choice == "S&P 500":
-        return get_sp500_tickers(k)
-    if choice == "STOXX Europe 600":
-        return get_stoxx_europe_600()
-    if choice == "CDAX (DE Exchange Approx)":
-        if not k:
-            return []
-        return get_de_exchange_equities(k, exchange="DE")
-    if choice == "World (MSCI World via ETF holdings)":
-        if not k:
-            return []
-        return get_msci_world_universe_via_etf(k, etf_symbol=world_etf)
-    return []
+SCREEN_WORKERS = 4
 
 st.title("Value Screener (Graham / Buffett / GANÉ)")
 st.caption("iPad-freundlich: Universe auswählen → laden → screen → Ranking + Gründe. Live Quotes + filings-nahe Fundamentals.")
@@ -113,6 +62,34 @@ with col2:
     max_debt_fcf = st.slider("Max Debt/FCF (Jahre)", 0.0, 20.0, 5.0, 0.5)
     min_icov = st.slider("Min Interest Coverage", 0.0, 30.0, 5.0, 0.5)
 
+buffett_params = {
+    "min_roic": min_roic,
+    "min_margin": min_margin,
+    "max_debt_to_fcf": max_debt_fcf,
+    "min_interest_coverage": min_icov,
+}
+
+with st.expander("Relativ zur Branche (optional)", expanded=False):
+    st.caption("Perzentil innerhalb der Branche (Finnhub-Profil), 0 = kleinster, 1 = größter Wert (PE: klein = günstig). Branchen mit < 5 Werten → Perzentil im gesamten Universe. Aktiv → Score mischt 20 % relative Kriterien bei.")
+    rc1, rc2, rc3 = st.columns(3)
+    with rc1:
+        min_roic_pct = st.slider("Min ROIC-Perzentil", 0.0, 1.0, 0.0, 0.05, help="0 = aus")
+    with rc2:
+        min_margin_pct = st.slider("Min Margen-Perzentil", 0.0, 1.0, 0.0, 0.05, help="0 = aus")
+    with rc3:
+        max_pe_pct = st.slider("Max PE-Perzentil", 0.0, 1.0, 1.0, 0.05, help="1 = aus")
+
+relative = {
+    "min_pct": {k: v for k, v in (("roic", min_roic_pct), ("operating_margin", min_margin_pct)) if v > 0},
+    "max_pct": {k: v for k, v in (("pe", max_pe_pct),) if v < 1},
+}
+
+col3, col4 = st.columns(2)
+with col3:
+    budget_s = st.slider("Zeitbudget Screen (Sek.)", 5, 300, 60, 5)
+with col4:
+    ticker_timeout_s = st.slider("Max. Zeit pro Ticker (Sek.)", 2, 30, 15, 1)
+
 if st.button("Universe laden"):
     if choice == "Manuelle Ticker":
         uni = [t.strip().upper() for t in manual.split(",") if t.strip()]
@@ -139,109 +116,162 @@ tickers = uni[start:end][:top_n]
 
 st.write(f"Screening-Liste: {len(tickers)} Ticker (Seite {page}, Größe {page_size}, TopN {top_n})")
 
-def compute_pe_pb(price: float | None, shares_abs: float | None, ttm_netinc: float | None, equity: float | None) -> tuple[float | None, float | None]:
-    pe = None
-    pb = None
-    if price is not None and shares_abs and ttm_netinc not in (None, 0):
-        eps = float(ttm_netinc) / float(shares_abs)
-        if eps != 0:
-            pe = float(price) / eps
-    if price is not None and shares_abs and equity not in (None, 0):
-        book_per_share = float(equity) / float(shares_abs)
-        if book_per_share != 0:
-            pb = float(price) / book_per_share
-    return pe, pb
-
-if st.button("Screen"):
-    if not tickers:
+prev = st.session_state.get("results")
+unfinished = [r["ticker"] for r in prev["rows"] if r.get("status") in UNFINISHED] if prev else []
+
+b1, b2 = st.columns(2)
+with b1:
+    do_screen = st.button("Screen")
+with b2:
+    do_resume = st.button(f"Offene fortsetzen ({len(unfinished)})", disabled=not unfinished)
+
+if do_screen or do_resume:
+    todo = unfinished if do_resume else tickers
+    if not todo:
         st.warning("Keine Ticker ausgewählt. Erst Universe laden oder manuelle Ticker eingeben.")
         st.stop()
     if not api_key():
         st.error("FINNHUB_API_KEY fehlt. (In Streamlit Secrets oder ENV setzen.)")
         st.stop()
 
-    rows = []
     progress = st.progress(0, text="Screening läuft…")
+    rows = screen_with_budget(
+        todo,
+        quote=get_quote,
+        profile=get_profile,
+        reported=get_reported,
+        budget_s=budget_s,
+        ticker_timeout_s=ticker_timeout_s,
+        max_workers=SCREEN_WORKERS,
+        on_progress=lambda done, total: progress.progress(done / max(1, total), text=f"Screening läuft… {done}/{total}"),
+    )
+    progress.empty()
+    if do_resume:
+        # Merge the re-screened tickers back into the previous result set
+        fresh = {r["ticker"]: r for r in rows}
+        rows = [fresh.get(r["ticker"], r) for r in prev["rows"]]
+
+    st.session_state["results"] = {
+        "rows": rows,
+        # Fundamentals + industry/universe percentiles: built once per screen, rescored on every rerun
+        "frame": universe_frame(rows),
+        "run": time.time(),
+    }
+
+def render_details(r: dict, buffett_params: dict, relative: dict, frame: pd.DataFrame) -> None:
+    t = r["ticker"]
+    if "error" in r:
+        st.markdown(f"### {t} — ❌ Fehler")
+        st.error(r["error"])
+        return
+    if r.get("status") in UNFINISHED:
+        st.markdown(f"### {t} — {status_label(r)}")
+        st.info("Nicht rechtzeitig fertig geworden. „Offene fortsetzen“ screent nur die offenen Ticker.")
+        return
+
+    st.markdown(f"### {t} — {verdict(r['score'])} (Score {r['score']})")
+    price = r.get("price")
+    if price is not None:
+        st.write(f"Preis: {price}")
+    else:
+        st.write("Preis: n/a")
+
+    # Reasons are only built for the selected row
+    f = r["f"]
+    b = buffett_screen(f, **buffett_params)
+    g = graham_screen(f)
+    st.write("**Buffett**")
+    for s in b.reasons:
+        st.write("• " + s)
+    st.write("**Graham**")
+    for s in g.reasons:
+        st.write("• " + s)
+
+    st.write("**Kennzahlen (berechnet)**")
+    st.json({
+        "roic": f.get("roic"),
+        "operating_margin": f.get("operating_margin"),
+        "debt_to_fcf": f.get("debt_to_fcf"),
+        "interest_coverage": f.get("interest_coverage"),
+        "current_ratio": f.get("current_ratio"),
+        "debt_to_equity": f.get("debt_to_equity"),
+        "pe": f.get("pe"),
+        "pb": f.get("pb"),
+        "ttm_fcf": f.get("ttm_fcf"),
+    })
 
-    for i, t in enumerate(tickers, start=1):
-        try:
-            q = get_quote(t)
-            price = q.get("c", None)
-            quote_ts = q.get("t", None)
-
-            prof = get_profile(t)
-            shares_abs = normalize_shares(prof.get("shareOutstanding", None))
-
-            rep = get_reported(t)
-            periods = parse_periods(rep)
-            f = build_fundamentals_from_reported(periods)
-
-            pe, pb = compute_pe_pb(price, shares_abs, f.get("ttm_netinc", None), f.get("bs_equity_avg2", None))
-            f["pe"] = pe
-            f["pb"] = pb
-
-            b = buffett_screen(
-                f,
-                min_roic=min_roic,
-                min_margin=min_margin,
-                max_debt_to_fcf=max_debt_fcf,
-                min_interest_coverage=min_icov,
-            )
-            g = graham_screen(f)
-            combo = score_combo(b.score, g.score)
-
-            rows.append({
-                "ticker": t,
-                "price": price,
-                "quote_t": quote_ts,
-                "score": combo,
-                "buffett_pass": b.passed,
-                "graham_pass": g.passed,
-                "b": b,
-                "g": g,
-                "f": f,
-            })
-        except Exception as e:
-            rows.append({"ticker": t, "price": None, "score": 0, "error": str(e)})
+    if t in frame.index:
+        st.write(f"**Relativ (Branche: {r.get('industry') or 'n/a'})**")
+        rel = frame.loc[t].astype(object).where(frame.loc[t].notna(), None)  # NaN → null for st.json
+
+        def basis(m: str) -> str | None:
+            # Same fallback as the relative criteria (screens.relative_spec)
+            if rel.get(f"{m}_pct_ind") is not None:
+                return "Branche"
+            return "Universe (Fallback)" if rel.get(f"{m}_pct_all") is not None else None
+
+        st.json({
+            m: {"perzentil_branche": rel.get(f"{m}_pct_ind"), "z_branche": rel.get(f"{m}_z_ind"),
+                "perzentil_universe": rel.get(f"{m}_pct_all"), "basis": basis(m)}
+            for m in ("roic", "operating_margin", "debt_to_fcf", "pe", "pb")
+        })
+        rel_spec = relative_spec(**relative)
+        if rel_spec is not None:
+            st.write("**Relative Kriterien**")
+            for s in explain_screen(rel_spec, frame.loc[t].to_dict()):
+                st.write("• " + s)
 
-        progress.progress(i / max(1, len(tickers)), text=f"Screening läuft… {i}/{len(tickers)}")
+results = st.session_state.get("results")
+if results:
+    rows = results["rows"]
+    scoring_key = f"{results['run']}_{hash(repr((buffett_params, relative)))}"
 
-    progress.empty()
-    rows.sort(key=lambda r: r.get("score", 0), reverse=True)
+    # Rescoring is vectorized over the stored frame, so slider changes re-rank without re-screening
+    scores, strategies = score_rows(rows, buffett_params, relative=relative, frame=results["frame"])
+    scores = scores[[f"score_{s.name}" for s in strategies]]
+    sort_rows(rows)
 
-    st.subheader("Ranking")
-    for r in rows:
-        t = r["ticker"]
-        if "error" in r:
-            st.markdown(f"### {t} — ❌ Fehler")
-            st.error(r["error"])
-            continue
-
-        st.markdown(f"### {t} — {verdict(r['score'])} (Score {r['score']})")
-        price = r.get("price")
-        if price is not None:
-            st.write(f"Preis: {price}")
-        else:
-            st.write("Preis: n/a")
-
-        with st.expander("Warum / Details"):
-            st.write("**Buffett**")
-            for s in r["b"].reasons:
-                st.write("• " + s)
-            st.write("**Graham**")
-            for s in r["g"].reasons:
-                st.write("• " + s)
+    with st.expander("Strategien vergleichen", expanded=False):
+        st.dataframe(scores.sort_values(scores.columns[0], ascending=False), use_container_width=True)
 
-            f = r["f"]
-            st.write("**Kennzahlen (berechnet)**")
-            st.json({
-                "roic": f.get("roic"),
-                "operating_margin": f.get("operating_margin"),
-                "debt_to_fcf": f.get("debt_to_fcf"),
-                "interest_coverage": f.get("interest_coverage"),
-                "current_ratio": f.get("current_ratio"),
-                "debt_to_equity": f.get("debt_to_equity"),
-                "pe": f.get("pe"),
-                "pb": f.get("pb"),
-                "ttm_fcf": f.get("ttm_fcf"),
-            })
+    st.subheader("Ranking")
+    n_open = sum(1 for r in rows if r.get("status") in UNFINISHED)
+    if n_open:
+        st.warning(f"Zeitbudget/Zeitlimit erreicht: {n_open} von {len(rows)} Tickern offen (unten markiert). Ranking zeigt die fertigen.")
+    st.caption("Zeile antippen für Gründe und Kennzahlen. Spaltenköpfe sortieren.")
+    event = st.dataframe(
+        ranking_table(rows),
+        use_container_width=True,
+        hide_index=True,
+        height=min(600, 38 + 35 * len(rows)),
+        on_select="rerun",
+        selection_mode="single-row",
+        # New run or new scoring parameters → new order, so drop the old selection
+        key=f"ranking_{scoring_key}",
+        column_config={
+            "Score": st.column_config.ProgressColumn("Score", min_value=0, max_value=100, format="%d"),
+            "ROIC": st.column_config.NumberColumn("ROIC", format="percent"),
+            "PE": st.column_config.NumberColumn("PE", format="%.1f"),
+            "PB": st.column_config.NumberColumn("PB", format="%.2f"),
+        },
+    )
+    # Exports are built on demand and kept until the run or the scoring changes,
+    # so slider reruns don't serialize the whole universe twice
+    exports = results.get("exports")
+    if exports is None or exports["key"] != scoring_key:
+        if st.button("Export erstellen"):
+            exports = results["exports"] = {
+                "key": scoring_key,
+                "csv": to_csv_bytes(rows),
+                "parquet": to_parquet_bytes(rows),
+            }
+    if exports is not None and exports["key"] == scoring_key:
+        d1, d2 = st.columns(2)
+        with d1:
+            st.download_button("Export CSV", exports["csv"], file_name="screen_results.csv", mime="text/csv")
+        with d2:
+            st.download_button("Export Parquet", exports["parquet"], file_name="screen_results.parquet", mime="application/octet-stream")
+
+    selected = event.selection.rows
+    if selected and selected[0] < len(rows):
+        render_details(rows[selected[0]], buffett_params, relative, results["frame"])
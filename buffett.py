@@ -66,7 +66,9 @@ def buffett_screen(
         ok_all = False
         reasons.append("Debt/FCF fehlt (FCF/NetDebt nicht verfügbar)")
     elif d_fcf <= max_debt_to_fcf:
-        bonus = max(0.0, (max_debt_to_fcf - d_fcf) / max_debt_to_fcf) * 25.0
+        # max 0 → only net-cash (≤ 0) passes; full credit, no division (as screens.py)
+        credit = max(0.0, (max_debt_to_fcf - d_fcf) / max_debt_to_fcf) if max_debt_to_fcf else 1.0
+        bonus = credit * 25.0
         score += int(round(bonus))
         reasons.append(f"Debt/FCF ok ({d_fcf:.2f} ≤ {max_debt_to_fcf:.2f})")
     else:
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+import streamlit as st
+
+from finnhub import FinnhubClient
+from sp500 import get_sp500_tickers
+from stoxx import get_stoxx_europe_600
+from cdax import get_de_exchange_equities
+from world import get_msci_world_universe_via_etf
+
+# Cached Finnhub getters, shared by the app and the load-test harness (loadtest.py).
+# `_timeout` (per-request HTTP timeout) is not part of the cache key.
+
+QUOTE_TTL = 20
+PROFILE_TTL = 24 * 60 * 60
+REPORTED_TTL = 6 * 60 * 60
+UNIVERSE_TTL = 24 * 60 * 60
+
+def api_key() -> str:
+    try:
+        secret = st.secrets.get("FINNHUB_API_KEY", None)
+    except Exception:
+        # No secrets.toml (local run / bare mode): ENV only
+        secret = None
+    return (secret or os.getenv("FINNHUB_API_KEY") or "").strip()
+
+@st.cache_data(ttl=QUOTE_TTL)
+def get_quote(symbol: str, _timeout: float | None = None) -> dict:
+    return FinnhubClient(api_key=api_key()).quote(symbol, timeout=_timeout)
+
+@st.cache_data(ttl=PROFILE_TTL)
+def get_profile(symbol: str, _timeout: float | None = None) -> dict:
+    return FinnhubClient(api_key=api_key()).profile2(symbol, timeout=_timeout)
+
+@st.cache_data(ttl=REPORTED_TTL)
+def get_reported(symbol: str, _timeout: float | None = None) -> dict:
+    return FinnhubClient(api_key=api_key()).financials_reported(symbol, timeout=_timeout)
+
+@st.cache_data(ttl=UNIVERSE_TTL)
+def load_universe(choice: str, world_etf: str = "URTH") -> list[str]:
+    k = api_key()
+    if choice == "S&P 500":
+        return get_sp500_tickers(k)
+    if choice == "STOXX Europe 600":
+        return get_stoxx_europe_600()
+    if choice == "CDAX (DE Exchange Approx)":
+        if not k:
+            return []
+        return get_de_exchange_equities(k, exchange="DE")
+    if choice == "World (MSCI World via ETF holdings)":
+        if not k:
+            return []
+        return get_msci_world_universe_via_etf(k, etf_symbol=world_etf)
+    return []
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+from screening import FUNDAMENTAL_KEYS
+
+FORMATS = ("parquet", "arrow", "csv")
+
+# Fixed schema so chunked exports of a large universe always line up
+SCHEMA = pa.schema(
+    [
+        ("ticker", pa.string()),
+        ("industry", pa.string()),
+        ("score", pa.int64()),
+        ("buffett_score", pa.int64()),
+        ("graham_score", pa.int64()),
+        ("buffett_pass", pa.bool_()),
+        ("graham_pass", pa.bool_()),
+        ("price", pa.float64()),
+        ("quote_t", pa.int64()),
+        ("quote_time", pa.timestamp("s", tz="UTC")),
+    ]
+    + [(k, pa.float64()) for k in FUNDAMENTAL_KEYS]
+    + [("status", pa.string()), ("error", pa.string())]
+)
+
+
+def results_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Flatten screen rows (incl. every fundamentals key) into one typed, columnar frame."""
+    base = pd.DataFrame(rows, columns=["ticker", "industry", "score", "buffett_score", "graham_score",
+                                       "buffett_pass", "graham_pass", "price", "quote_t", "status", "error"])
+    fund = pd.DataFrame([r.get("f") or {} for r in rows], columns=list(FUNDAMENTAL_KEYS))
+
+    df = pd.DataFrame({"ticker": base["ticker"].astype("string"), "industry": base["industry"].astype("string")})
+    for c in ("score", "buffett_score", "graham_score", "quote_t"):
+        df[c] = pd.to_numeric(base[c], errors="coerce").astype("Int64")
+    for c in ("buffett_pass", "graham_pass"):
+        df[c] = base[c].astype("boolean")
+    df["price"] = pd.to_numeric(base["price"], errors="coerce").astype(float)
+    df["quote_time"] = pd.to_datetime(df["quote_t"], unit="s", utc=True)
+    for k in FUNDAMENTAL_KEYS:
+        df[k] = pd.to_numeric(fund[k], errors="coerce").astype(float)
+    df["error"] = base["error"].astype("string")
+    # "ok" / "error", or the unfinished status (see screening.UNFINISHED)
+    df["status"] = base["status"].astype("string").fillna(
+        df["error"].notna().map({True: "error", False: "ok"}).astype("string")
+    )
+    return df[SCHEMA.names]
+
+
+def results_table(rows: List[Dict[str, Any]]) -> pa.Table:
+    return pa.Table.from_pandas(results_frame(rows), schema=SCHEMA, preserve_index=False)
+
+
+def _format_for(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        fmt = fmt.lower()
+    else:
+        ext = os.path.splitext(path)[1].lower().lstrip(".")
+        fmt = {"pq": "parquet", "feather": "arrow", "ipc": "arrow"}.get(ext, ext)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {FORMATS})")
+    return fmt
+
+
+class ResultsWriter:
+    """
+    Streaming export: write() each chunk of screened rows as it finishes; the file
+    is written batch-wise, so the full universe never has to be held in memory.
+    """
+
+    def __init__(self, sink: Any, fmt: Optional[str] = None):
+        self.fmt = _format_for(sink if isinstance(sink, str) else "", fmt)
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(sink, SCHEMA)
+        elif self.fmt == "arrow":
+            self._writer = pa_ipc.new_file(sink, SCHEMA)
+        else:
+            self._writer = pa_csv.CSVWriter(sink, SCHEMA)
+        self.rows_written = 0
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        self._writer.write_table(results_table(rows))
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def write_results(rows_chunks: Iterable[List[Dict[str, Any]]], path: str, fmt: Optional[str] = None) -> int:
+    with ResultsWriter(path, fmt) as w:
+        for chunk in rows_chunks:
+            w.write(chunk)
+    return w.rows_written
+
+
+def to_bytes(rows: List[Dict[str, Any]], fmt: str) -> bytes:
+    buf = pa.BufferOutputStream()
+    with ResultsWriter(buf, fmt) as w:
+        w.write(rows)
+    return buf.getvalue().to_pybytes()
+
+
+def to_parquet_bytes(rows: List[Dict[str, Any]]) -> bytes:
+    return to_bytes(rows, "parquet")
+
+
+def to_csv_bytes(rows: List[Dict[str, Any]]) -> bytes:
+    return to_bytes(rows, "csv")
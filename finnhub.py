@@ -8,37 +8,39 @@ FINNHUB_BASE = "https://finnhub.io/api/v1"
 
 
 class FinnhubClient:
-    def __init__(self, api_key: str | None = None, timeout: int = 12):
+    def __init__(self, api_key: str | None = None, timeout: int = 12, base_url: str | None = None):
         self.api_key = api_key or os.getenv("FINNHUB_API_KEY")
         if not self.api_key:
             raise ValueError("FINNHUB_API_KEY missing")
         self.timeout = timeout
+        # FINNHUB_BASE_URL points the client at a stand-in server (see loadtest.py)
+        self.base_url = (base_url or os.getenv("FINNHUB_BASE_URL") or FINNHUB_BASE).rstrip("/")
         self.session = requests.Session()
 
-    def quote(self, symbol: str) -> Dict[str, Any]:
+    def quote(self, symbol: str, timeout: float | None = None) -> Dict[str, Any]:
         # Docs: /quote returns {c,h,l,o,pc,t}
-        url = f"{FINNHUB_BASE}/quote"
-        r = self.session.get(url, params={"symbol": symbol.upper(), "token": self.api_key}, timeout=self.timeout)
+        url = f"{self.base_url}/quote"
+        r = self.session.get(url, params={"symbol": symbol.upper(), "token": self.api_key}, timeout=timeout or self.timeout)
         r.raise_for_status()
         return r.json()
 
-    def profile2(self, symbol: str) -> Dict[str, Any]:
+    def profile2(self, symbol: str, timeout: float | None = None) -> Dict[str, Any]:
         # Docs: /stock/profile2 includes shareOutstanding, marketCapitalization, etc.
-        url = f"{FINNHUB_BASE}/stock/profile2"
-        r = self.session.get(url, params={"symbol": symbol.upper(), "token": self.api_key}, timeout=self.timeout)
+        url = f"{self.base_url}/stock/profile2"
+        r = self.session.get(url, params={"symbol": symbol.upper(), "token": self.api_key}, timeout=timeout or self.timeout)
         r.raise_for_status()
         return r.json()
 
-    def financials_reported(self, symbol: str) -> Dict[str, Any]:
+    def financials_reported(self, symbol: str, timeout: float | None = None) -> Dict[str, Any]:
         # Docs: /stock/financials-reported (filings-near)
-        url = f"{FINNHUB_BASE}/stock/financials-reported"
-        r = self.session.get(url, params={"symbol": symbol.upper(), "token": self.api_key}, timeout=self.timeout)
+        url = f"{self.base_url}/stock/financials-reported"
+        r = self.session.get(url, params={"symbol": symbol.upper(), "token": self.api_key}, timeout=timeout or self.timeout)
         r.raise_for_status()
         return r.json()
 
     def stock_symbols(self, exchange: str) -> list[dict[str, Any]]:
         # Docs: /stock/symbol
-        url = f"{FINNHUB_BASE}/stock/symbol"
+        url = f"{self.base_url}/stock/symbol"
         r = self.session.get(url, params={"exchange": exchange, "token": self.api_key}, timeout=30)
         r.raise_for_status()
         data = r.json() or []
@@ -48,7 +50,7 @@ class FinnhubClient:
 
     def etf_holdings(self, symbol: str) -> Dict[str, Any]:
         # Docs: /etf/holdings
-        url = f"{FINNHUB_BASE}/etf/holdings"
+        url = f"{self.base_url}/etf/holdings"
         r = self.session.get(url, params={"symbol": symbol.upper(), "token": self.api_key}, timeout=30)
         r.raise_for_status()
         return r.json()
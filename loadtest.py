@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from streamlit import config as st_config, logger as st_logger
+
+# Bare-mode (no Streamlit runtime) cache/context warnings would otherwise flood the report
+st_config.set_option("logger.level", "error")
+st_logger.set_log_level("error")
+
+from cached import get_quote, get_profile, get_reported, load_universe
+from export import to_csv_bytes, to_parquet_bytes
+from ranking import ranking_table, sort_rows
+from screening import UNFINISHED, score_rows, screen_with_budget, universe_frame
+
+# Median latency (seconds) per stand-in endpoint; actual latency is lognormal around it
+LATENCY = {
+    "/quote": 0.06,
+    "/stock/profile2": 0.12,
+    "/stock/financials-reported": 0.45,
+    "/stock/symbol": 0.8,
+    "/etf/holdings": 0.5,
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+def _reported_payload(symbol: str) -> Dict[str, Any]:
+    """Four synthetic quarters using the XBRL concepts financials_as_reported looks for."""
+    rng = random.Random(zlib.crc32(symbol.encode()))
+    rev = rng.uniform(200e6, 20e9) / 4
+    margin = rng.uniform(-0.05, 0.35)
+    equity = rev * rng.uniform(1.0, 6.0)
+    debt = equity * rng.uniform(0.0, 1.5)
+    data = []
+    for q in range(1, 5):
+        opinc = rev * margin
+        data.append({
+            "year": 2025,
+            "quarter": q,
+            "report": {
+                "ic": [
+                    {"concept": "Revenues", "value": rev},
+                    {"concept": "OperatingIncomeLoss", "value": opinc},
+                    {"concept": "IncomeBeforeIncomeTaxes", "value": opinc * 0.95},
+                    {"concept": "IncomeTaxExpenseBenefit", "value": opinc * 0.2},
+                    {"concept": "NetIncomeLoss", "value": opinc * 0.75},
+                    {"concept": "InterestExpense", "value": debt * 0.01},
+                ],
+                "bs": [
+                    {"concept": "CashAndCashEquivalentsAtCarryingValue", "value": rev * rng.uniform(0.1, 1.0)},
+                    {"concept": "AssetsCurrent", "value": rev * 2.0},
+                    {"concept": "LiabilitiesCurrent", "value": rev * rng.uniform(0.8, 2.5)},
+                    {"concept": "StockholdersEquity", "value": equity},
+                    {"concept": "LongTermDebtNoncurrent", "value": debt},
+                ],
+                "cf": [
+                    {"concept": "NetCashProvidedByUsedInOperatingActivities", "value": opinc * rng.uniform(0.6, 1.3)},
+                    {"concept": "PaymentsToAcquirePropertyPlantAndEquipment", "value": rev * rng.uniform(0.01, 0.1)},
+                ],
+            },
+        })
+    return {"symbol": symbol, "data": data}
+
+
+class StubFinnhub:
+    """
+    Local stand-in for the Finnhub endpoints the app uses: realistic (lognormal)
+    latency, an occasional hanging response, and a token-bucket rate limit
+    answering 429 like the real API.
+    """
+
+    def __init__(
+        self,
+        *,
+        universe_size: int = 500,
+        rate_limit: float = 30.0,
+        burst: float = 30.0,
+        latency_scale: float = 1.0,
+        slow_prob: float = 0.01,
+        slow_s: float = 8.0,
+        seed: int = 0,
+    ):
+        self.symbols = [f"SYM{i:04d}" for i in range(universe_size)]
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.latency_scale = latency_scale
+        self.slow_prob = slow_prob
+        self.slow_s = slow_s
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.throttled = 0
+        self.count_lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubFinnhub":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _delay(self, path: str) -> float:
+        with self.rng_lock:
+            if self.rng.random() < self.slow_prob:
+                return self.slow_s
+            return LATENCY.get(path, 0.1) * self.rng.lognormvariate(0.0, 0.5) * self.latency_scale
+
+    def _body(self, path: str, symbol: str) -> Any:
+        if path == "/quote":
+            rng = random.Random(zlib.crc32(symbol.encode()))
+            return {"c": round(rng.uniform(5, 500), 2), "t": int(time.time())}
+        if path == "/stock/profile2":
+            rng = random.Random(zlib.crc32(symbol.encode()) + 1)
+            return {"ticker": symbol, "shareOutstanding": rng.uniform(50, 5000), "finnhubIndustry": rng.choice(
+                ["Technology", "Banking", "Pharmaceuticals", "Retail", "Utilities", "Machinery"])}
+        if path == "/stock/financials-reported":
+            return _reported_payload(symbol)
+        if path == "/stock/symbol":
+            return [{"symbol": s, "type": "Common Stock"} for s in self.symbols]
+        if path == "/etf/holdings":
+            return {"holdings": [{"symbol": s} for s in self.symbols]}
+        return None
+
+    def _handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                u = urlparse(self.path)
+                symbol = (parse_qs(u.query).get("symbol") or [""])[0]
+                with stub.count_lock:
+                    stub.calls[u.path] = stub.calls.get(u.path, 0) + 1
+                if not stub.bucket.take():
+                    with stub.count_lock:
+                        stub.throttled += 1
+                    self._send(429, {"error": "API limit reached. Please try again later."})
+                    return
+                time.sleep(stub._delay(u.path))
+                body = stub._body(u.path, symbol)
+                if body is None:
+                    self._send(404, {"error": "unknown endpoint"})
+                else:
+                    self._send(200, body)
+
+            def _send(self, code: int, body: Any) -> None:
+                raw = json.dumps(body).encode()
+                try:
+                    self.send_response(code)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(raw)))
+                    self.end_headers()
+                    self.wfile.write(raw)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout / cancelled screen)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def _slider_values(rng: random.Random) -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+    """Random Buffett and (sometimes empty) relative slider values, as in the app sidebar."""
+    buffett_params = {
+        "min_roic": rng.choice([0.08, 0.10, 0.12, 0.15, 0.20]),
+        "min_margin": rng.choice([0.05, 0.10, 0.15]),
+        "max_debt_to_fcf": rng.choice([0.0, 3.0, 5.0, 8.0]),
+        "min_interest_coverage": rng.choice([3.0, 5.0, 10.0]),
+    }
+    min_pct = {m: rng.choice([0.5, 0.7, 0.9]) for m in ("roic", "operating_margin") if rng.random() < 0.5}
+    max_pct = {"pe": rng.choice([0.3, 0.5])} if rng.random() < 0.5 else {}
+    return buffett_params, {"min_pct": min_pct, "max_pct": max_pct}
+
+
+def run_session(i: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    One simulated app session: load universe, pick a page, screen, build the
+    universe frame once, then rerun the ranking with new slider values
+    `args.reruns` times. The last rerun also builds the exports (the app's
+    "Export erstellen"), timed separately.
+    """
+    rng = random.Random(args.seed * 100_003 + i)
+    t0 = time.monotonic()
+    uni = load_universe("S&P 500")
+    top_n = rng.randrange(10, max(10, args.max_top_n) + 1, 10)
+    page = rng.randrange(0, max(1, len(uni) // top_n))
+    tickers = uni[page * top_n:(page + 1) * top_n]
+
+    t1 = time.monotonic()
+    rows = screen_with_budget(
+        tickers,
+        quote=get_quote,
+        profile=get_profile,
+        reported=get_reported,
+        budget_s=args.budget,
+        ticker_timeout_s=args.ticker_timeout,
+        max_workers=args.workers,
+    )
+    t2 = time.monotonic()
+    frame = universe_frame(rows)
+    t3 = time.monotonic()
+
+    rerun_s = []
+    export_s = None
+    for k in range(args.reruns):
+        buffett_params, relative = _slider_values(rng)
+        r0 = time.monotonic()
+        score_rows(rows, buffett_params, relative=relative, frame=frame)
+        sort_rows(rows)
+        ranking_table(rows)
+        rerun_s.append(time.monotonic() - r0)
+        if k == args.reruns - 1:
+            e0 = time.monotonic()
+            to_csv_bytes(rows)
+            to_parquet_bytes(rows)
+            export_s = time.monotonic() - e0
+
+    return {
+        "session": i,
+        "tickers": len(tickers),
+        "universe_s": t1 - t0,
+        "screen_s": t2 - t1,
+        "frame_s": t3 - t2,
+        "rerun_s": rerun_s,
+        "export_s": export_s,
+        "ok": sum(1 for r in rows if "f" in r),
+        "errors": sum(1 for r in rows if "error" in r),
+        "unfinished": sum(1 for r in rows if r.get("status") in UNFINISHED),
+    }
+
+
+def _percentiles(name: str, values: List[float]) -> Dict[str, Optional[float]]:
+    lat = np.array(values, dtype=float)
+    if not len(lat):
+        return {f"{name}_p50_s": None, f"{name}_p99_s": None, f"{name}_max_s": None}
+    return {
+        f"{name}_p50_s": float(np.percentile(lat, 50)),
+        f"{name}_p99_s": float(np.percentile(lat, 99)),
+        f"{name}_max_s": float(lat.max()),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    stub = StubFinnhub(
+        universe_size=args.universe_size,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        latency_scale=args.latency_scale,
+        slow_prob=args.slow_prob,
+        slow_s=args.slow_s,
+        seed=args.seed,
+    ).start()
+    # The cached getters build their own FinnhubClient; route them to the stand-in
+    saved_env = {k: os.environ.get(k) for k in ("FINNHUB_BASE_URL", "FINNHUB_API_KEY")}
+    os.environ["FINNHUB_BASE_URL"] = stub.url
+    os.environ.setdefault("FINNHUB_API_KEY", "loadtest")
+
+    if args.trace_memory:
+        tracemalloc.start()
+    t0 = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            sessions = list(pool.map(lambda i: run_session(i, args), range(args.sessions)))
+    finally:
+        wall = time.monotonic() - t0
+        stub.stop()
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+    if args.trace_memory:
+        tracemalloc.stop()
+
+    api_calls = sum(stub.calls.values())
+    tickers = sum(s["tickers"] for s in sessions)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "wall_s": wall,
+        "throughput_sessions_per_s": args.sessions / wall if wall else None,
+        "throughput_tickers_per_s": tickers / wall if wall else None,
+        **_percentiles("screen", [s["screen_s"] for s in sessions]),
+        # Once per screen: fundamentals + industry/universe percentiles
+        **_percentiles("frame", [s["frame_s"] for s in sessions]),
+        # Per slider change: rescoring + sort + ranking table
+        **_percentiles("rerun", [x for s in sessions for x in s["rerun_s"]]),
+        **_percentiles("export", [s["export_s"] for s in sessions if s["export_s"] is not None]),
+        "api_calls": api_calls,
+        "api_calls_per_session": api_calls / args.sessions,
+        "api_calls_by_endpoint": dict(stub.calls),
+        "throttled_429": stub.throttled,
+        "tickers_ok": sum(s["ok"] for s in sessions),
+        "tickers_error": sum(s["errors"] for s in sessions),
+        "tickers_unfinished": sum(s["unfinished"] for s in sessions),
+        "peak_rss_mb": maxrss / 1e6,
+        "peak_traced_mb": traced_peak / 1e6 if traced_peak is not None else None,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Drive N simulated app sessions against a local stand-in Finnhub server.")
+    p.add_argument("--sessions", type=int, default=20)
+    p.add_argument("--concurrency", type=int, default=5, help="Sessions running at the same time")
+    p.add_argument("--universe-size", type=int, default=500)
+    p.add_argument("--max-top-n", type=int, default=100)
+    p.add_argument("--reruns", type=int, default=5, help="Slider reruns (rescore + rank) per session")
+    p.add_argument("--rate-limit", type=float, default=30.0, help="Stand-in API calls/second before 429")
+    p.add_argument("--burst", type=float, default=30.0)
+    p.add_argument("--latency-scale", type=float, default=1.0)
+    p.add_argument("--slow-prob", type=float, default=0.01, help="Share of responses that hang for --slow-s")
+    p.add_argument("--slow-s", type=float, default=8.0)
+    p.add_argument("--budget", type=float, default=60.0, help="Screen time budget per session (s)")
+    p.add_argument("--ticker-timeout", type=float, default=15.0)
+    p.add_argument("--workers", type=int, default=4, help="Fetch threads per session (app: SCREEN_WORKERS)")
+    p.add_argument("--trace-memory", action="store_true", help="Also report tracemalloc peak (slower)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for k, v in report.items():
+            print(f"{k:28s} {v:.3f}" if isinstance(v, float) else f"{k:28s} {v}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
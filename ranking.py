@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from screening import TIMEOUT, UNFINISHED
+
+# Ranking helpers of the app, importable without Streamlit (the load test times them too)
+
+
+def verdict(score: int) -> str:
+    if score >= 80: return "✅ Stark"
+    if score >= 60: return "⚠️ Okay"
+    return "❌ Schwach"
+
+
+def status_label(r: dict) -> str:
+    if "error" in r:
+        return "❌ Fehler"
+    if r.get("status") == TIMEOUT:
+        return "⏳ Zeitlimit"
+    if r.get("status") in UNFINISHED:
+        return "⏳ Offen"
+    return verdict(r.get("score", 0))
+
+
+def sort_rows(rows: list[dict]) -> None:
+    """Finished tickers first (by score), unfinished ones at the bottom."""
+    rows.sort(key=lambda r: (r.get("status") not in UNFINISHED, r.get("score", 0)), reverse=True)
+
+
+def ranking_table(rows: list[dict]) -> pd.DataFrame:
+    """One flat row per ticker; rendered as a single (virtualized, sortable) dataframe."""
+    return pd.DataFrame([{
+        "Ticker": r["ticker"],
+        "Score": r.get("score", 0),
+        "Urteil": status_label(r),
+        "Branche": r.get("industry"),
+        "Preis": r.get("price"),
+        "Buffett": r.get("buffett_pass"),
+        "Graham": r.get("graham_pass"),
+        "ROIC": (r.get("f") or {}).get("roic"),
+        "PE": (r.get("f") or {}).get("pe"),
+        "PB": (r.get("f") or {}).get("pb"),
+    } for r in rows])
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Suffixes of the relative columns added next to each metric
+PCT_INDUSTRY = "_pct_ind"   # percentile rank within the industry (0..1, higher = larger value)
+Z_INDUSTRY = "_z_ind"       # z-score within the industry
+PCT_UNIVERSE = "_pct_all"   # percentile rank within the whole screened universe
+
+MIN_GROUP = 5  # smaller industries get NaN for industry-relative columns
+
+# Ratios only meaningful when positive: a negative P/E (loss) is not "cheap"
+POSITIVE_ONLY = ("pe", "pb")
+
+
+def industry_series(rows: Sequence[Dict[str, Any]]) -> pd.Series:
+    """Industry (Finnhub profile2 `finnhubIndustry`) per screened ticker."""
+    s = pd.Series({r["ticker"]: r.get("industry") or None for r in rows if "f" in r}, dtype=object)
+    s.index.name = "ticker"
+    return s
+
+
+def relative_metrics(
+    frame: pd.DataFrame,
+    industry: pd.Series,
+    metrics: Optional[Sequence[str]] = None,
+    *,
+    min_group: int = MIN_GROUP,
+) -> pd.DataFrame:
+    """
+    Percentiles and z-scores for every metric, per industry and universe-wide,
+    computed with one groupby over the whole frame (no per-row statistics).
+    POSITIVE_ONLY metrics count as missing when <= 0.
+    """
+    cols = [m for m in (metrics or frame.columns) if m in frame.columns]
+    x = frame[cols].astype(float)
+    pos = [m for m in POSITIVE_ONLY if m in x.columns]
+    x[pos] = x[pos].where(x[pos] > 0)
+    ind = industry.reindex(x.index)
+
+    g = x.groupby(ind, dropna=True, sort=False)
+    pct = g.rank(pct=True)
+    mean = g.transform("mean")
+    std = g.transform("std")
+    size = g.transform("count")
+
+    small = size < min_group
+    pct = pct.mask(small)
+    z = ((x - mean) / std.replace(0.0, np.nan)).mask(small)
+
+    return pd.concat([
+        pct.add_suffix(PCT_INDUSTRY),
+        z.add_suffix(Z_INDUSTRY),
+        x.rank(pct=True).add_suffix(PCT_UNIVERSE),
+    ], axis=1)
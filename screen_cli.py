@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from finnhub import FinnhubClient
+from screening import screen_tickers
+from export import ResultsWriter, FORMATS
+from sp500 import get_sp500_tickers
+from stoxx import get_stoxx_europe_600
+from cdax import get_de_exchange_equities
+from world import get_msci_world_universe_via_etf
+
+UNIVERSES = ("sp500", "stoxx", "cdax", "world")
+
+
+def load_universe(name: str, api_key: str, world_etf: str = "URTH") -> List[str]:
+    if name == "sp500":
+        return get_sp500_tickers(api_key)
+    if name == "stoxx":
+        return get_stoxx_europe_600()
+    if name == "cdax":
+        return get_de_exchange_equities(api_key, exchange="DE")
+    if name == "world":
+        return get_msci_world_universe_via_etf(api_key, etf_symbol=world_etf)
+    return []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Screen a universe without the UI and export the results (Parquet/Arrow/CSV).")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--tickers", help="Comma-separated tickers, e.g. AAPL,MSFT,JNJ")
+    src.add_argument("--universe", choices=UNIVERSES)
+    p.add_argument("--world-etf", default="URTH")
+    p.add_argument("--out", required=True, help="Output file (.parquet, .arrow/.feather or .csv)")
+    p.add_argument("--format", choices=FORMATS, default=None, help="Override format from file extension")
+    p.add_argument("--chunk-size", type=int, default=200, help="Tickers screened per streamed write")
+    p.add_argument("--limit", type=int, default=0, help="Only screen the first N tickers (0 = all)")
+    p.add_argument("--min-roic", type=float, default=0.12)
+    p.add_argument("--min-margin", type=float, default=0.10)
+    p.add_argument("--max-debt-fcf", type=float, default=5.0)
+    p.add_argument("--min-icov", type=float, default=5.0)
+    args = p.parse_args(argv)
+
+    api_key = (os.getenv("FINNHUB_API_KEY") or "").strip()
+    if not api_key:
+        print("FINNHUB_API_KEY missing", file=sys.stderr)
+        return 2
+
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    else:
+        tickers = load_universe(args.universe, api_key, world_etf=args.world_etf)
+    if args.limit:
+        tickers = tickers[: args.limit]
+
+    client = FinnhubClient(api_key=api_key)
+    buffett_params = {
+        "min_roic": args.min_roic,
+        "min_margin": args.min_margin,
+        "max_debt_to_fcf": args.max_debt_fcf,
+        "min_interest_coverage": args.min_icov,
+    }
+
+    # Rows are written per chunk (not globally re-ranked) so large universes stream to disk
+    size = max(1, args.chunk_size)
+    with ResultsWriter(args.out, args.format) as w:
+        for i in range(0, len(tickers), size):
+            rows = screen_tickers(
+                tickers[i:i + size],
+                quote=client.quote,
+                profile=client.profile2,
+                reported=client.financials_reported,
+                buffett_params=buffett_params,
+            )
+            w.write(rows)
+            print(f"{min(i + size, len(tickers))}/{len(tickers)} screened", file=sys.stderr)
+
+    print(f"Wrote {w.rows_written} rows to {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
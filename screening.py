@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import threading
+import time
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from financials_as_reported import parse_periods, build_fundamentals_from_reported
+from screens import Strategy, buffett_spec, graham_spec, relative_spec, default_strategies, compile_strategies, fundamentals_frame
+from relative import industry_series, relative_metrics
+
+# fetch(ticker) or, with a deadline, fetch(ticker, _timeout=seconds) (see cached.py)
+Fetch = Callable[..., Dict[str, Any]]
+
+# Row status for tickers that did not finish within the screen budget (resumable)
+PENDING = "offen"
+TIMEOUT = "timeout"
+UNFINISHED = (PENDING, TIMEOUT)
+
+# Every key produced by build_fundamentals_from_reported, plus the price-based ratios
+FUNDAMENTAL_KEYS: Tuple[str, ...] = tuple(build_fundamentals_from_reported([])) + ("pe", "pb")
+
+
+class Cancelled(Exception):
+    pass
+
+
+def normalize_shares(shares_raw: float | None) -> float | None:
+    if shares_raw is None:
+        return None
+    s = float(shares_raw)
+    # Heuristic: if very small, treat as "millions"
+    if s < 100_000:
+        return s * 1_000_000.0
+    return s
+
+
+def compute_pe_pb(price: float | None, shares_abs: float | None, ttm_netinc: float | None, equity: float | None) -> tuple[float | None, float | None]:
+    pe = None
+    pb = None
+    if price is not None and shares_abs and ttm_netinc not in (None, 0):
+        eps = float(ttm_netinc) / float(shares_abs)
+        if eps != 0:
+            pe = float(price) / eps
+    if price is not None and shares_abs and equity not in (None, 0):
+        book_per_share = float(equity) / float(shares_abs)
+        if book_per_share != 0:
+            pb = float(price) / book_per_share
+    return pe, pb
+
+
+def unfinished_row(t: str, status: str) -> Dict[str, Any]:
+    return {"ticker": t, "price": None, "score": 0, "status": status}
+
+
+def screen_ticker(
+    t: str,
+    *,
+    quote: Fetch,
+    profile: Fetch,
+    reported: Fetch,
+    cancel: Optional[threading.Event] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch + compute fundamentals for one ticker. Errors end up in the row, never raised.
+    If `cancel` is set, no further fetch is started and Cancelled is raised instead.
+    With a `deadline` (time.monotonic()), each fetch gets the time left as `_timeout`,
+    so an abandoned ticker's HTTP call ends with its deadline.
+    """
+    def fetch_opts() -> Dict[str, Any]:
+        if cancel is not None and cancel.is_set():
+            raise Cancelled(t)
+        if deadline is None:
+            return {}
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise Cancelled(t)
+        return {"_timeout": left}
+
+    try:
+        q = quote(t, **fetch_opts())
+        price = q.get("c", None)
+        quote_ts = q.get("t", None)
+
+        prof = profile(t, **fetch_opts())
+        industry = prof.get("finnhubIndustry", None)
+        shares_abs = normalize_shares(prof.get("shareOutstanding", None))
+
+        rep = reported(t, **fetch_opts())
+        periods = parse_periods(rep)
+        f = build_fundamentals_from_reported(periods)
+
+        pe, pb = compute_pe_pb(price, shares_abs, f.get("ttm_netinc", None), f.get("bs_equity_avg2", None))
+        f["pe"] = pe
+        f["pb"] = pb
+
+        return {
+            "ticker": t,
+            "price": price,
+            "quote_t": quote_ts,
+            "score": 0,
+            "industry": industry,
+            "f": f,
+        }
+    except Cancelled:
+        raise
+    except Exception as e:
+        return {"ticker": t, "price": None, "score": 0, "error": str(e)}
+
+
+def universe_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Fundamentals table plus industry/universe percentiles and z-scores for every
+    metric. Depends only on fetched data, so it is built once per screen.
+    """
+    f = fundamentals_frame(rows)
+    return pd.concat([f, relative_metrics(f, industry_series(rows), FUNDAMENTAL_KEYS)], axis=1)
+
+
+def score_rows(
+    rows: List[Dict[str, Any]],
+    buffett_params: Optional[Dict[str, float]] = None,
+    *,
+    relative: Optional[Dict[str, Dict[str, float]]] = None,
+    frame: Optional[pd.DataFrame] = None,
+) -> Tuple[pd.DataFrame, List[Strategy]]:
+    """
+    Score all rows in one vectorized pass (see screens.py) and write score and
+    pass flags back into each row. `relative` holds optional percentile criteria
+    ({"min_pct": {...}, "max_pct": {...}}, see screens.relative_spec); when set,
+    the ranking score is the blended "gane_rel". Pass a prebuilt universe_frame
+    to skip rebuilding it (e.g. when only slider values changed).
+    """
+    rel = relative_spec(**(relative or {}))
+    strategies = default_strategies(buffett_spec(**(buffett_params or {})), graham_spec(), rel)
+    if frame is None:
+        frame = universe_frame(rows) if rel is not None else fundamentals_frame(rows)
+    scores = compile_strategies(strategies)(frame)
+
+    main = "score_gane_rel" if rel is not None else "score_gane"
+    recs = scores.rename(columns={main: "score"})[
+        ["score", "buffett_score", "graham_score", "buffett_pass", "graham_pass"]
+    ].to_dict("index")
+    for r in rows:
+        if "f" in r:
+            r.update(recs[r["ticker"]])
+    return scores, strategies
+
+
+def screen_tickers(
+    tickers: Sequence[str],
+    *,
+    quote: Fetch,
+    profile: Fetch,
+    reported: Fetch,
+    buffett_params: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """Non-UI screen: fetch, score and rank (best first)."""
+    rows = [screen_ticker(t, quote=quote, profile=profile, reported=reported) for t in tickers]
+    score_rows(rows, buffett_params)
+    rows.sort(key=lambda r: r.get("score", 0), reverse=True)
+    return rows
+
+
+def screen_with_budget(
+    tickers: Sequence[str],
+    *,
+    quote: Fetch,
+    profile: Fetch,
+    reported: Fetch,
+    budget_s: float,
+    ticker_timeout_s: float,
+    max_workers: int = 4,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Screen concurrently within a total time budget, at most `max_workers` tickers
+    at a time. A ticker still running after `ticker_timeout_s` is abandoned (status
+    TIMEOUT) and its slot goes to the next ticker right away; each fetch gets the
+    time left until the ticker's deadline as `_timeout`, so its HTTP call ends then
+    too instead of holding a connection for the client's default timeout. When the budget
+    expires, tickers not yet finished come back as PENDING and no new fetch is
+    started. Rows come back in input order, unscored; unfinished rows have no "f"
+    and can be re-screened later.
+    """
+    deadline = time.monotonic() + budget_s
+    todo = list(dict.fromkeys(tickers))
+    queue = list(reversed(todo))
+    cancels = {t: threading.Event() for t in todo}
+    finished: Queue[Tuple[str, Optional[Dict[str, Any]]]] = Queue()
+    running: Dict[str, float] = {}  # ticker -> start time
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def run(t: str, t0: float) -> None:
+        try:
+            row = screen_ticker(t, quote=quote, profile=profile, reported=reported,
+                                cancel=cancels[t], deadline=t0 + ticker_timeout_s)
+            # An error at the deadline is the request timeout we set: resumable, not an error
+            if "error" in row and time.monotonic() >= t0 + ticker_timeout_s:
+                row = None
+            finished.put((t, row))
+        except Cancelled:
+            finished.put((t, None))
+
+    try:
+        while queue or running:
+            while queue and len(running) < max(1, max_workers):
+                t = queue.pop()
+                running[t] = time.monotonic()
+                # Daemon thread per ticker: an abandoned one cannot block the next ticker or exit
+                threading.Thread(target=run, args=(t, running[t]), daemon=True).start()
+
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            next_timeout = min(running.values()) + ticker_timeout_s
+            try:
+                t, row = finished.get(timeout=max(0.0, min(0.25, deadline - now, next_timeout - now)))
+                if t in running:  # late results of abandoned tickers are ignored
+                    del running[t]
+                    results[t] = row if row is not None else unfinished_row(t, TIMEOUT)
+            except Empty:
+                pass
+
+            now = time.monotonic()
+            for t, t0 in list(running.items()):
+                if now - t0 > ticker_timeout_s:
+                    cancels[t].set()
+                    del running[t]
+                    results[t] = unfinished_row(t, TIMEOUT)
+            if on_progress is not None:
+                on_progress(len(results), len(todo))
+    finally:
+        # Budget spent: queued tickers never start; running ones start no further fetch
+        for ev in cancels.values():
+            ev.set()
+
+    return [results.get(t) or unfinished_row(t, PENDING) for t in todo]
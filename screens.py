@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+CURVES = ("step", "linear_to_max")
+MISSING_POLICIES = ("fail", "ignore")
+
+
+@dataclass(frozen=True)
+class Criterion:
+    """One metric test: bounds, points and how partial credit / missing data count."""
+    metric: str
+    points: float
+    min: Optional[float] = None
+    max: Optional[float] = None
+    min_strict: bool = False      # True: value must be > min (e.g. PE > 0)
+    curve: str = "step"           # "step": all-or-nothing, "linear_to_max": (max - v) / max
+    missing: str = "fail"         # "fail": missing fails the screen, "ignore": no effect on pass
+    fallback: Optional[str] = None  # column used where `metric` is missing
+
+
+@dataclass(frozen=True)
+class ScreenSpec:
+    name: str
+    criteria: Tuple[Criterion, ...]
+    max_score: int = 100
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """Weighted blend of screens, e.g. GANÉ = 0.65 Buffett + 0.35 Graham."""
+    name: str
+    weights: Tuple[Tuple[ScreenSpec, float], ...]
+
+
+def criterion_from_dict(d: Dict[str, Any]) -> Criterion:
+    c = Criterion(
+        metric=str(d["metric"]),
+        points=float(d.get("points", 0.0)),
+        min=None if d.get("min") is None else float(d["min"]),
+        max=None if d.get("max") is None else float(d["max"]),
+        min_strict=bool(d.get("min_strict", False)),
+        curve=str(d.get("curve", "step")),
+        missing=str(d.get("missing", "fail")),
+        fallback=None if d.get("fallback") is None else str(d["fallback"]),
+    )
+    if c.curve not in CURVES:
+        raise ValueError(f"Unknown curve {c.curve!r} (expected one of {CURVES})")
+    if c.missing not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing policy {c.missing!r} (expected one of {MISSING_POLICIES})")
+    if c.curve == "linear_to_max" and c.max is None:
+        raise ValueError(f"Curve 'linear_to_max' needs 'max' ({c.metric})")
+    return c
+
+
+def screen_from_dict(d: Dict[str, Any]) -> ScreenSpec:
+    """
+    Build a screen from a plain dict (e.g. loaded from JSON):
+
+      {"name": "graham", "criteria": [
+          {"metric": "pe", "min": 0, "min_strict": true, "max": 15, "points": 30}, ...]}
+    """
+    crits = tuple(criterion_from_dict(c) for c in d.get("criteria", []) or [])
+    return ScreenSpec(name=str(d["name"]), criteria=crits, max_score=int(d.get("max_score", 100)))
+
+
+def strategy_from_dict(d: Dict[str, Any], screens: Dict[str, ScreenSpec]) -> Strategy:
+    weights = tuple((screens[k], float(w)) for k, w in (d.get("weights", {}) or {}).items())
+    return Strategy(name=str(d["name"]), weights=weights)
+
+
+def buffett_spec(
+    *,
+    min_roic: float = 0.12,
+    min_margin: float = 0.10,
+    max_debt_to_fcf: float = 5.0,
+    min_interest_coverage: float = 5.0,
+) -> ScreenSpec:
+    """Same rules and weights (35/25/25/15) as buffett.buffett_screen."""
+    return ScreenSpec("buffett", (
+        Criterion("roic", 35, min=min_roic),
+        Criterion("operating_margin", 25, min=min_margin),
+        Criterion("debt_to_fcf", 25, max=max_debt_to_fcf, curve="linear_to_max"),
+        Criterion("interest_coverage", 15, min=min_interest_coverage),
+    ))
+
+
+def graham_spec(
+    *,
+    max_pe: float = 15.0,
+    max_pb: float = 1.5,
+    min_current_ratio: float = 1.5,
+    max_debt_to_equity: float = 1.0,
+) -> ScreenSpec:
+    """Same rules and weights (30/30/20/20) as graham.graham_screen."""
+    return ScreenSpec("graham", (
+        Criterion("pe", 30, min=0.0, min_strict=True, max=max_pe),
+        Criterion("pb", 30, min=0.0, min_strict=True, max=max_pb),
+        Criterion("current_ratio", 20, min=min_current_ratio),
+        Criterion("debt_to_equity", 20, min=0.0, max=max_debt_to_equity),
+    ))
+
+
+def relative_spec(
+    *,
+    min_pct: Optional[Dict[str, float]] = None,
+    max_pct: Optional[Dict[str, float]] = None,
+    suffix: str = "_pct_ind",
+    fallback_suffix: Optional[str] = "_pct_all",
+) -> Optional[ScreenSpec]:
+    """
+    Optional criteria on percentile columns from relative.relative_metrics, e.g.
+    min_pct={"roic": 0.7} (top 30% of its industry), max_pct={"pe": 0.3}.
+    Points are split evenly; None if no criterion is set.
+    """
+    bounds = [(m, v, None) for m, v in (min_pct or {}).items()] + [(m, None, v) for m, v in (max_pct or {}).items()]
+    if not bounds:
+        return None
+    pts = 100.0 / len(bounds)
+    # No industry percentile (industry too small / unknown) → universe percentile instead.
+    # Without the metric at all: no relative points (like the absolute screens), but no fail either.
+    return ScreenSpec("relative", tuple(
+        Criterion(f"{m}{suffix}", pts, min=lo, max=hi, missing="ignore",
+                  fallback=f"{m}{fallback_suffix}" if fallback_suffix else None)
+        for m, lo, hi in bounds
+    ))
+
+
+def default_strategies(buffett: ScreenSpec, graham: ScreenSpec, relative: Optional[ScreenSpec] = None) -> List[Strategy]:
+    # GANÉ-ish: quality > cheap (adjust later if desired)
+    out = [
+        Strategy("gane", ((buffett, 0.65), (graham, 0.35))),
+        Strategy("buffett", ((buffett, 1.0),)),
+        Strategy("graham", ((graham, 1.0),)),
+    ]
+    if relative is not None:
+        # 80% absolute GANÉ, 20% relative criteria
+        out.append(Strategy("gane_rel", ((buffett, 0.52), (graham, 0.28), (relative, 0.20))))
+    return out
+
+
+def fundamentals_frame(rows: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """One row per ticker (index), one float column per fundamentals key; non-numeric → NaN."""
+    recs = {r["ticker"]: r["f"] or {} for r in rows if "f" in r}
+    df = pd.DataFrame.from_dict(recs, orient="index")
+    df.index.name = "ticker"
+    for c in df.columns:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df.astype(float)
+
+
+def _compile_criterion(c: Criterion) -> Callable[[pd.DataFrame], Tuple[np.ndarray, np.ndarray]]:
+    lo, hi = c.min, c.max
+
+    def evaluate(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(df)
+        if c.metric in df.columns:
+            v = df[c.metric].to_numpy(dtype=float, na_value=np.nan)
+        else:
+            v = np.full(n, np.nan)
+        if c.fallback is not None and c.fallback in df.columns:
+            v = np.where(np.isnan(v), df[c.fallback].to_numpy(dtype=float, na_value=np.nan), v)
+        present = ~np.isnan(v)
+        ok = present.copy()
+        with np.errstate(invalid="ignore"):
+            if lo is not None:
+                ok &= (v > lo) if c.min_strict else (v >= lo)
+            if hi is not None:
+                ok &= v <= hi
+        if c.curve == "linear_to_max":
+            if hi:
+                credit = np.maximum(0.0, (hi - v) / hi)
+            else:
+                credit = np.ones(n)
+            pts = np.where(ok, np.round(credit * c.points), 0.0)
+        else:
+            pts = np.where(ok, float(c.points), 0.0)
+        passed = ok | (~present if c.missing == "ignore" else np.zeros(n, dtype=bool))
+        return pts, passed
+
+    return evaluate
+
+
+def compile_screen(spec: ScreenSpec) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """Compile once; the returned evaluator scores a whole fundamentals frame column-wise."""
+    parts = [_compile_criterion(c) for c in spec.criteria]
+
+    def evaluate(df: pd.DataFrame) -> pd.DataFrame:
+        score = np.zeros(len(df))
+        passed = np.ones(len(df), dtype=bool)
+        for p in parts:
+            pts, ok = p(df)
+            score += pts
+            passed &= ok
+        return pd.DataFrame({
+            f"{spec.name}_score": np.minimum(score, spec.max_score).astype(int),
+            f"{spec.name}_pass": passed,
+        }, index=df.index)
+
+    return evaluate
+
+
+def _bounds_text(c: Criterion) -> str:
+    parts = []
+    if c.min is not None:
+        parts.append(f"{'>' if c.min_strict else '≥'} {c.min:g}")
+    if c.max is not None:
+        parts.append(f"≤ {c.max:g}")
+    return " und ".join(parts) or "beliebig"
+
+
+def explain_screen(spec: ScreenSpec, values: Dict[str, Any]) -> List[str]:
+    """
+    Reasons for one ticker, derived from the same compiled criteria that score
+    the frame (so they cannot disagree). Works for any spec, incl. screen_from_dict.
+    """
+    cols = {col for c in spec.criteria for col in (c.metric, c.fallback) if col}
+    one = fundamentals_frame([{"ticker": "_", "f": {k: values.get(k) for k in cols}}])
+    reasons: List[str] = []
+    for c in spec.criteria:
+        pts, ok = _compile_criterion(c)(one)
+        v = one.at["_", c.metric] if c.metric in one.columns else np.nan
+        src = c.metric
+        if np.isnan(v) and c.fallback and c.fallback in one.columns and not np.isnan(one.at["_", c.fallback]):
+            v, src = one.at["_", c.fallback], f"{c.metric} → {c.fallback}"
+        if np.isnan(v):
+            reasons.append(f"{src} fehlt" + (" (ignoriert)" if c.missing == "ignore" else ""))
+        elif ok[0]:
+            reasons.append(f"{src} ok ({v:.2f}, {_bounds_text(c)}; +{pts[0]:g})")
+        else:
+            reasons.append(f"{src} nicht ok ({v:.2f}, erwartet {_bounds_text(c)})")
+    return reasons
+
+
+def compile_strategies(strategies: Sequence[Strategy]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """
+    Compile several strategies into one evaluator. Each distinct screen is evaluated
+    once per call, so comparing many blends over the same data stays a single pass.
+    """
+    screens: Dict[str, ScreenSpec] = {}
+    for s in strategies:
+        for spec, _ in s.weights:
+            if screens.setdefault(spec.name, spec) != spec:
+                raise ValueError(f"Two different screens named {spec.name!r}")
+    evaluators = [compile_screen(spec) for spec in screens.values()]
+
+    def evaluate(df: pd.DataFrame) -> pd.DataFrame:
+        out = pd.concat([e(df) for e in evaluators], axis=1) if evaluators else pd.DataFrame(index=df.index)
+        for s in strategies:
+            total = np.zeros(len(df))
+            for spec, w in s.weights:
+                total += w * out[f"{spec.name}_score"].to_numpy()
+            out[f"score_{s.name}"] = np.round(total).astype(int)
+        return out
+
+    return evaluate
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules live flat in the repo root (see app_streamlit.py imports)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,23 @@
+from buffett import buffett_screen
+
+from screens import buffett_spec, compile_screen, fundamentals_frame
+
+
+def _f(d_fcf):
+    return {"roic": 0.2, "operating_margin": 0.2, "debt_to_fcf": d_fcf, "interest_coverage": 10.0}
+
+
+def test_zero_max_debt_to_fcf_does_not_divide_by_zero():
+    net_cash = buffett_screen(_f(-1.0), max_debt_to_fcf=0.0)
+    assert net_cash.passed and net_cash.score == 100
+
+    indebted = buffett_screen(_f(2.0), max_debt_to_fcf=0.0)
+    assert not indebted.passed and indebted.score == 75
+
+
+def test_zero_max_debt_to_fcf_matches_compiled_spec():
+    rows = [{"ticker": "CASH", "f": _f(-1.0)}, {"ticker": "DEBT", "f": _f(2.0)}]
+    out = compile_screen(buffett_spec(max_debt_to_fcf=0.0))(fundamentals_frame(rows))
+    for r in rows:
+        b = buffett_screen(r["f"], max_debt_to_fcf=0.0)
+        assert (out.at[r["ticker"], "buffett_score"], out.at[r["ticker"], "buffett_pass"]) == (b.score, b.passed)
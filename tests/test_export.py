@@ -0,0 +1,82 @@
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+import pytest
+
+from export import SCHEMA, ResultsWriter, results_table, to_bytes, write_results
+from screening import FUNDAMENTAL_KEYS, PENDING, unfinished_row
+
+ROWS = [
+    {"ticker": "OK", "industry": "Tech", "price": 10.0, "quote_t": 1700000000, "score": 80,
+     "buffett_score": 90, "graham_score": 60, "buffett_pass": True, "graham_pass": False,
+     "f": {"roic": 0.2, "pe": 12.5}},
+    {"ticker": "ERR", "price": None, "score": 0, "error": "HTTP 500"},
+    unfinished_row("OPEN", PENDING),
+]
+
+
+def _check(table):
+    assert table.schema.names == SCHEMA.names
+    d = {r["ticker"]: r for r in table.to_pylist()}
+    assert [d[t]["status"] for t in ("OK", "ERR", "OPEN")] == ["ok", "error", PENDING]
+    assert d["ERR"]["error"] == "HTTP 500"
+    assert d["OK"]["quote_time"].timestamp() == 1700000000
+    assert d["ERR"]["quote_time"] is None
+    assert d["OK"]["roic"] == 0.2 and d["OK"]["pe"] == 12.5
+    assert d["OPEN"]["roic"] is None
+
+
+def test_schema_order():
+    assert SCHEMA.names[:2] == ["ticker", "industry"]
+    assert SCHEMA.names[-2:] == ["status", "error"]
+    assert SCHEMA.names[10:-2] == list(FUNDAMENTAL_KEYS)
+
+
+def test_results_table():
+    table = results_table(ROWS)
+    assert table.schema == SCHEMA
+    _check(table)
+
+
+def test_parquet_round_trip():
+    _check(pq.read_table(pa.BufferReader(to_bytes(ROWS, "parquet"))))
+
+
+def test_csv_round_trip():
+    table = pa_csv.read_csv(io.BytesIO(to_bytes(ROWS, "csv")),
+                            convert_options=pa_csv.ConvertOptions(column_types=SCHEMA))
+    _check(table.select(SCHEMA.names))
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow", "csv"])
+def test_chunks_line_up(tmp_path, fmt):
+    # The first chunk has no fundamentals at all, the second no industry: columns must still match
+    chunks = [ROWS[1:], ROWS[:1]]
+    path = str(tmp_path / f"out.{fmt}")
+    assert write_results(chunks, path) == 3
+    if fmt == "parquet":
+        table = pq.read_table(path)
+    elif fmt == "arrow":
+        table = pa_ipc.open_file(path).read_all()
+    else:
+        table = pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(column_types=SCHEMA))
+    assert table.column("ticker").to_pylist() == ["ERR", "OPEN", "OK"]
+    _check(table.select(SCHEMA.names))
+
+
+def test_writer_counts_rows_and_skips_empty_chunks():
+    buf = pa.BufferOutputStream()
+    with ResultsWriter(buf, "parquet") as w:
+        w.write([])
+        w.write(ROWS[:2])
+        w.write(ROWS[2:])
+    assert w.rows_written == 3
+    assert pq.read_table(pa.BufferReader(buf.getvalue())).num_rows == 3
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown export format"):
+        ResultsWriter("out.xlsx")
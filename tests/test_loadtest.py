@@ -0,0 +1,23 @@
+import os
+
+from loadtest import build_parser, run
+
+
+def test_run_smoke():
+    env = {k: os.environ.get(k) for k in ("FINNHUB_BASE_URL", "FINNHUB_API_KEY")}
+    args = build_parser().parse_args([
+        "--sessions", "2", "--concurrency", "2", "--universe-size", "20", "--max-top-n", "10",
+        "--reruns", "3", "--slow-prob", "0", "--latency-scale", "0.05", "--rate-limit", "1000",
+        "--burst", "1000", "--budget", "20", "--ticker-timeout", "10",
+    ])
+    report = run(args)
+
+    assert report["sessions"] == 2
+    assert report["tickers_ok"] == 20
+    assert report["tickers_error"] == report["tickers_unfinished"] == report["throttled_429"] == 0
+    # Sessions on the same page share the cached responses
+    assert 0 < report["api_calls_by_endpoint"]["/stock/financials-reported"] <= 20
+    for name in ("screen", "frame", "rerun", "export"):
+        assert report[f"{name}_p50_s"] is not None
+    # The stand-in's URL does not leak into later code
+    assert {k: os.environ.get(k) for k in env} == env
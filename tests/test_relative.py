@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from relative import industry_series, relative_metrics
+from screening import score_rows, universe_frame
+from screens import fundamentals_frame
+
+
+def _rows(n_big=10):
+    rows = []
+    for i in range(n_big):
+        rows.append({"ticker": f"BIG{i}", "industry": "Big", "f": {"roic": 0.05 * i, "pe": 5.0 + i}})
+    rows.append({"ticker": "SOLO", "industry": "Solo", "f": {"roic": 1.0, "pe": 8.0}})
+    rows.append({"ticker": "LOSS", "industry": "Big", "f": {"roic": 0.0, "pe": -3.0}})
+    return rows
+
+
+def test_industry_percentile_and_z_score():
+    rows = _rows()
+    rel = relative_metrics(fundamentals_frame(rows), industry_series(rows), ["roic"])
+    # BIG9 has the largest ROIC of the 11 "Big" tickers
+    assert rel.at["BIG9", "roic_pct_ind"] == 1.0
+    assert rel.at["BIG9", "roic_z_ind"] > 1.0
+    assert rel.at["SOLO", "roic_pct_all"] == 1.0
+    assert pd.isna(rel.at["SOLO", "roic_pct_ind"])
+    assert pd.isna(rel.at["SOLO", "roic_z_ind"])
+
+
+def test_small_industry_falls_back_to_universe_percentile():
+    rows = _rows()
+    frame = universe_frame(rows)
+    assert pd.isna(frame.at["SOLO", "roic_pct_ind"])
+    scores, _ = score_rows(rows, relative={"min_pct": {"roic": 0.7}}, frame=frame)
+    assert scores.at["SOLO", "relative_score"] == 100
+
+
+@pytest.mark.parametrize("metric", ["pe_pct_ind", "pe_pct_all"])
+def test_non_positive_pe_is_not_ranked(metric):
+    frame = universe_frame(_rows())
+    assert pd.isna(frame.at["LOSS", metric])
+
+
+def test_non_positive_pe_is_not_cheap():
+    rows = _rows()
+    scores, _ = score_rows(rows, relative={"max_pct": {"pe": 0.3}}, frame=universe_frame(rows))
+    assert scores.at["LOSS", "relative_score"] == 0
+    assert scores.at["BIG0", "relative_score"] == 100
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from screening import PENDING, TIMEOUT, screen_with_budget
+
+HANG = threading.Event()  # never set: hanging fetches block until the test process exits
+BLOCKED = set()  # hanging tickers whose fetch is still blocked
+SEEN_BLOCKED = {}  # healthy ticker -> hanging tickers blocked while it was fetched
+
+
+def _quote(t, _timeout=None):
+    return {"c": 10.0, "t": 1700000000}
+
+
+def _profile(t, _timeout=None):
+    return {"shareOutstanding": 100}
+
+
+def _reported(t, _timeout=None):
+    if t.startswith("HANG"):
+        BLOCKED.add(t)
+        HANG.wait(30)
+        BLOCKED.discard(t)
+    else:
+        SEEN_BLOCKED[t] = set(BLOCKED)
+    return {"data": []}
+
+
+def test_abandoned_tickers_free_their_worker_slot():
+    hanging = [f"HANG{i}" for i in range(4)]
+    rows = screen_with_budget(
+        hanging + ["A", "B"],
+        quote=_quote,
+        profile=_profile,
+        reported=_reported,
+        budget_s=10.0,
+        ticker_timeout_s=1.0,
+        max_workers=4,
+    )
+
+    by_ticker = {r["ticker"]: r for r in rows}
+    assert [r["ticker"] for r in rows] == hanging + ["A", "B"]
+    for t in hanging:
+        assert by_ticker[t]["status"] == TIMEOUT
+    for t in ("A", "B"):
+        assert "f" in by_ticker[t], by_ticker[t]
+        # Screened while all four abandoned threads were still blocked: they held no slot
+        assert set(hanging) <= SEEN_BLOCKED[t]
+
+
+def test_fetches_get_time_left_before_ticker_deadline():
+    timeouts = []
+
+    def slow_quote(t, _timeout=None):
+        timeouts.append(_timeout)
+        time.sleep(0.3)
+        return _quote(t)
+
+    def reported(t, _timeout=None):
+        timeouts.append(_timeout)
+        return _reported(t)
+
+    rows = screen_with_budget(
+        ["A"],
+        quote=slow_quote,
+        profile=_profile,
+        reported=reported,
+        budget_s=5.0,
+        ticker_timeout_s=2.0,
+    )
+    assert "f" in rows[0]
+    first, last = timeouts
+    assert 1.5 < first <= 2.0
+    # The slow quote used up part of the ticker's time
+    assert last <= first - 0.3
+
+
+def test_budget_expiry_marks_unstarted_tickers_pending():
+    rows = screen_with_budget(
+        ["HANG0", "A"],
+        quote=_quote,
+        profile=_profile,
+        reported=_reported,
+        budget_s=0.5,
+        ticker_timeout_s=10.0,
+        max_workers=1,
+    )
+    assert [r.get("status") for r in rows] == [PENDING, PENDING]
@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from buffett import buffett_screen
+from graham import graham_screen
+from screens import (
+    Criterion,
+    ScreenSpec,
+    Strategy,
+    buffett_spec,
+    compile_screen,
+    compile_strategies,
+    criterion_from_dict,
+    default_strategies,
+    explain_screen,
+    fundamentals_frame,
+    graham_spec,
+    screen_from_dict,
+)
+
+METRICS = ["roic", "operating_margin", "debt_to_fcf", "interest_coverage",
+           "pe", "pb", "current_ratio", "debt_to_equity"]
+
+
+def _random_rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        f = {}
+        for k in METRICS:
+            if rng.random() < 0.15:
+                f[k] = None
+            else:
+                scale = 0.05 if k in ("roic", "operating_margin") else 1.0
+                f[k] = rng.uniform(-3, 25) * scale
+        rows.append({"ticker": f"T{i}", "f": f})
+    return rows
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"min_roic": 0.2, "min_margin": 0.05, "max_debt_to_fcf": 8.0, "min_interest_coverage": 3.0},
+    {"max_debt_to_fcf": 0.0},
+])
+def test_compiled_strategies_match_screen_functions(params):
+    rows = _random_rows(2000)
+    out = compile_strategies(default_strategies(buffett_spec(**params), graham_spec()))(fundamentals_frame(rows))
+    for r in rows:
+        b = buffett_screen(r["f"], **params)
+        g = graham_screen(r["f"])
+        o = out.loc[r["ticker"]]
+        assert (o["buffett_score"], bool(o["buffett_pass"])) == (b.score, b.passed)
+        assert (o["graham_score"], bool(o["graham_pass"])) == (g.score, g.passed)
+        assert o["score_gane"] == int(round(0.65 * b.score + 0.35 * g.score))
+
+
+@pytest.mark.parametrize("d, msg", [
+    ({"metric": "pe", "curve": "cubic"}, "Unknown curve"),
+    ({"metric": "pe", "missing": "maybe"}, "Unknown missing policy"),
+    ({"metric": "pe", "curve": "linear_to_max"}, "needs 'max'"),
+])
+def test_criterion_from_dict_validation(d, msg):
+    with pytest.raises(ValueError, match=msg):
+        criterion_from_dict(d)
+
+
+def test_screen_from_dict_round_trip():
+    spec = screen_from_dict({"name": "cheap", "criteria": [
+        {"metric": "pe", "min": 0, "min_strict": True, "max": 15, "points": 60},
+        {"metric": "pb", "max": 1.5, "points": 40, "missing": "ignore", "fallback": "pb_alt"},
+    ]})
+    assert spec.criteria[0] == Criterion("pe", 60, min=0.0, max=15.0, min_strict=True)
+    assert spec.criteria[1].fallback == "pb_alt"
+
+
+def _score(spec, f):
+    out = compile_screen(spec)(fundamentals_frame([{"ticker": "X", "f": f}]))
+    return int(out.at["X", f"{spec.name}_score"]), bool(out.at["X", f"{spec.name}_pass"])
+
+
+def test_linear_to_max_credit():
+    spec = ScreenSpec("s", (Criterion("d", 20, max=4.0, curve="linear_to_max"),))
+    assert _score(spec, {"d": 0.0}) == (20, True)
+    assert _score(spec, {"d": 1.0}) == (15, True)
+    assert _score(spec, {"d": 4.0}) == (0, True)
+    assert _score(spec, {"d": 5.0}) == (0, False)
+
+
+def test_missing_policies():
+    fail = ScreenSpec("s", (Criterion("a", 50, min=1.0), Criterion("b", 50, min=1.0)))
+    ignore = ScreenSpec("s", (Criterion("a", 50, min=1.0), Criterion("b", 50, min=1.0, missing="ignore")))
+    assert _score(fail, {"a": 2.0, "b": None}) == (50, False)
+    assert _score(ignore, {"a": 2.0, "b": None}) == (50, True)
+
+
+def test_fallback_column_used_only_where_metric_missing():
+    spec = ScreenSpec("s", (Criterion("a", 100, min=0.5, fallback="a_all"),))
+    assert _score(spec, {"a": None, "a_all": 0.9}) == (100, True)
+    assert _score(spec, {"a": 0.1, "a_all": 0.9}) == (0, False)
+
+
+def test_duplicate_screen_names_rejected():
+    s1 = ScreenSpec("x", (Criterion("a", 100, min=1.0),))
+    s2 = ScreenSpec("x", (Criterion("a", 100, min=2.0),))
+    with pytest.raises(ValueError, match="Two different screens"):
+        compile_strategies([Strategy("one", ((s1, 1.0),)), Strategy("two", ((s2, 1.0),))])
+
+
+def test_explain_screen_follows_compiled_rules():
+    spec = screen_from_dict({"name": "d", "criteria": [
+        {"metric": "pe", "min": 0, "min_strict": True, "max": 15, "points": 50},
+        {"metric": "roic", "min": 0.7, "points": 50, "missing": "ignore", "fallback": "roic_all"},
+        {"metric": "pb", "max": 1.5, "points": 0},
+    ]})
+    reasons = explain_screen(spec, {"pe": 20.0, "roic": None, "roic_all": 0.8})
+    assert reasons[0].startswith("pe nicht ok")
+    assert reasons[1].startswith("roic → roic_all ok")
+    assert reasons[2] == "pb fehlt"